@@ -2,13 +2,80 @@ import argparse
 import sys
 import json
 import os
-import shutil
-import random
-from datetime import datetime, timedelta
+import functools
+import itertools
+from datetime import date, datetime, timedelta
 
 BACKUP_SUFFIX = "backup_"
 SUGGESTION_SUFFIX = "suggestion_"
 ENCODING = "utf-8"
+# Files smaller than this are read directly, mmap setup costs more than it saves
+MMAP_THRESHOLD = 4096
+
+# Backup directories already created during this run
+verified_dirs = set()
+
+def stdlib_json_dumps(data):
+    try:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(ENCODING)
+    except UnicodeEncodeError:
+        # Lone surrogates (undecodable bytes from argv) are not valid UTF-8,
+        # so let json escape them instead
+        return json.dumps(data, separators=(",", ":")).encode(ENCODING)
+
+try:
+    import orjson
+
+    def json_loads(raw):
+        with memoryview(raw) as view:
+            try:
+                return orjson.loads(view)
+            except orjson.JSONDecodeError:
+                # orjson rejects escaped lone surrogates that json accepts
+                return json.loads(bytes(view))
+
+    def json_dumps(data):
+        try:
+            return orjson.dumps(data)
+        except orjson.JSONEncodeError:
+            return stdlib_json_dumps(data)
+
+    def json_dumps_line(data):
+        return json_dumps(data) + b"\n"
+except ImportError:
+    def json_loads(raw):
+        return json.loads(bytes(raw))
+
+    json_dumps = stdlib_json_dumps
+
+    def json_dumps_line(data):
+        return json_dumps(data) + b"\n"
+
+def json_loads_lines(raw):
+    # Parse memoryview slices of each line, so a mapped file is never copied
+    data = []
+    with memoryview(raw) as view:
+        start, size = 0, len(view)
+        while start < size:
+            end = raw.find(b"\n", start)
+            if end == -1:
+                end = size
+            with view[start:end] as line:
+                try:
+                    data.append(json_loads(line))
+                except ValueError:
+                    # Blank lines are skipped, only failing lines pay for the copy
+                    if bytes(line).strip():
+                        if raw[end:].strip():
+                            raise
+                        # A crash during an append can leave the last line half
+                        # written, possibly inside a multi-byte character
+                        print("Ignoring incomplete last line")
+            start = end + 1
+    return data
+
+def json_dumps_lines(data):
+    return b"".join(json_dumps_line(item) for item in data)
 
 def get_meal_input(args_meal):
     if not sys.stdin.isatty():
@@ -18,18 +85,20 @@ def get_meal_input(args_meal):
     else:
         return None
 
+@functools.lru_cache(maxsize=None)
 def get_data_file(live, cli_path=None):
     if live:
         if cli_path is None:
-            return "./live/meals.json"
+            return "./live/meals.jsonl"
         else:
-            return os.path.join(os.path.dirname(cli_path), "live", os.path.basename(cli_path) + ".json")
+            return os.path.join(os.path.dirname(cli_path), "live", os.path.basename(cli_path) + ".jsonl")
     else:
         if cli_path is None:
-            return "./test/meals.json"
+            return "./test/meals.jsonl"
         else:
-            return os.path.join(os.path.dirname(cli_path), "test", os.path.basename(cli_path) + ".json")
+            return os.path.join(os.path.dirname(cli_path), "test", os.path.basename(cli_path) + ".jsonl")
     
+@functools.lru_cache(maxsize=None)
 def get_suggestion_file(live, cli_path=None):
     if live:
         if cli_path is None:
@@ -42,237 +111,465 @@ def get_suggestion_file(live, cli_path=None):
         else:
             return os.path.join(os.path.dirname(cli_path), "test", SUGGESTION_SUFFIX + os.path.basename(cli_path) + ".json")    
     
+def format_timestamp(d):
+    return f"[{d.year:04d}-{d.month:02d}-{d.day:02d}]"
+
 def current_timestamp():
-    return datetime.now().strftime("[%Y-%m-%d]")
+    return format_timestamp(datetime.now())
 
-def valid_date(date):
-    if date is None:
+@functools.lru_cache(maxsize=None)
+def valid_date(date_str):
+    if date_str is None:
         return None
     try:
-        return datetime.strptime(date, "%Y-%m-%d").strftime("[%Y-%m-%d]")
+        # strptime also accepts unpadded input like 2024-1-5, so format the
+        # parsed date rather than reusing the string
+        return format_timestamp(datetime.strptime(date_str, "%Y-%m-%d"))
     except ValueError:
-        print(f"Not a valid date: '{date}'. Format must be YYYY-MM-DD.")
+        print(f"Not a valid date: '{date_str}'. Format must be YYYY-MM-DD.")
         sys.exit(1)
 
-def load_file(data_file):
+def load_file(data_file, loads=json_loads):
     try:
-        with open(data_file, "r", encoding=ENCODING) as file:
-            return json.load(file)
+        with open(data_file, "rb") as file:
+            if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD:
+                return loads(file.read())
+            import mmap
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return loads(mm)
     except FileNotFoundError:
         return []
-    except json.JSONDecodeError:
+    except ValueError:
+        # JSONDecodeError, or UnicodeDecodeError from the stdlib fallback
         print("Corrupted file. Abort loading")
         return None
 
-def save_file(data, data_file):
-    directory = os.path.dirname(data_file)
-    backup_file = os.path.join(directory, "backup", BACKUP_SUFFIX + os.path.basename(data_file))
+def content_digest(raw):
+    import hashlib
+    return hashlib.blake2b(raw, digest_size=8).digest()
+
+@functools.lru_cache(maxsize=None)
+def file_digest(data_file, mtime_ns):
+    with open(data_file, "rb") as file:
+        return content_digest(file.read())
+
+def get_backup_file(data_file):
+    return os.path.join(os.path.dirname(data_file), "backup", BACKUP_SUFFIX + os.path.basename(data_file))
+
+def ensure_backup_dir(data_file):
+    # Creating the backup directory also creates the data file's directory
+    backup_dir = os.path.dirname(get_backup_file(data_file))
+    if backup_dir not in verified_dirs:
+        os.makedirs(backup_dir, exist_ok=True)
+        verified_dirs.add(backup_dir)
 
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    if not os.path.exists(os.path.join(directory, "backup")):
-        os.makedirs(os.path.join(directory, "backup"))
+def get_append_size_file(data_file):
+    # Holds the data file's size before the last append, restore truncates
+    # back to it instead of append_lines copying the whole file to the backup
+    return get_backup_file(data_file) + ".size"
 
+def read_append_size(data_file):
     try:
-        if os.path.exists(data_file):
-            shutil.copy2(data_file, backup_file)
+        with open(get_append_size_file(data_file), "r", encoding=ENCODING) as file:
+            size = int(file.read())
+        if size <= os.path.getsize(data_file):
+            return size
+    except (OSError, ValueError):
+        pass
+    return None
+
+def clear_append_size(data_file):
+    try:
+        os.remove(get_append_size_file(data_file))
+    except FileNotFoundError:
+        pass
+
+def make_backup(data_file, truncate_to=None):
+    # Build the backup under a temp name and rename it into place, so the data
+    # file stays where it is and the backup is never half written
+    backup_file = get_backup_file(data_file)
+    backup_tmp = backup_file + ".tmp"
+    if not os.path.exists(data_file):
+        return
+    try:
+        try:
+            os.remove(backup_tmp)
+        except FileNotFoundError:
+            pass
+        linked = False
+        if truncate_to is None:
+            # save_file replaces the data file with a new inode, so a hard
+            # link keeps the old contents without copying them
+            try:
+                os.link(data_file, backup_tmp)
+                linked = True
+            except OSError:
+                pass
+        if not linked:
+            import shutil
+            shutil.copy2(data_file, backup_tmp)
+            if truncate_to is not None:
+                os.truncate(backup_tmp, truncate_to)
+        os.replace(backup_tmp, backup_file)
     except Exception as e:
         print(f"Warning could not create backup: {e}, {backup_file}")
 
+def save_file(data, data_file, dumps=json_dumps, backup=True):
     try:
-        with open(data_file, "w", encoding=ENCODING) as file:
-            json.dump(data, file, indent=2)
+        raw = dumps(data)
     except Exception as e:
         print(f"Error saving data: {e}")
+        return
+
+    # Leave the file and its backup alone if nothing changed
+    try:
+        stat = os.stat(data_file)
+        if stat.st_size == len(raw) and file_digest(data_file, stat.st_mtime_ns) == content_digest(raw):
+            return
+    except OSError:
+        pass
+
+    ensure_backup_dir(data_file)
+
+    # Write to a temp file first, then link the old file to the backup and
+    # rename the temp file over it, so a complete data file always exists
+    tmp_file = data_file + ".tmp"
+    try:
+        with open(tmp_file, "wb") as file:
+            file.write(raw)
+            file.flush()
+            os.fsync(file.fileno())
+    except Exception as e:
+        print(f"Error saving data: {e}")
+        return
+
+    if backup:
+        make_backup(data_file)
+    else:
+        # A recorded append offset means nothing once the file is rewritten,
+        # so turn it into a real backup first
+        appended_from = read_append_size(data_file)
+        if appended_from is not None:
+            make_backup(data_file, appended_from)
+    clear_append_size(data_file)
+
+    try:
+        os.replace(tmp_file, data_file)
+    except Exception as e:
+        print(f"Error saving data: {e}")
+
+def append_lines(data, data_file):
+    ensure_backup_dir(data_file)
+
+    try:
+        with open(data_file, "ab+") as file:
+            # Never glue new rows onto a line left unterminated by a crash
+            size = file.seek(0, os.SEEK_END)
+            if size:
+                file.seek(size - 1)
+                if file.read(1) != b"\n":
+                    return False
+            # Record where this append starts so restore can cut it off again
+            with open(get_append_size_file(data_file), "w", encoding=ENCODING) as size_file:
+                size_file.write(str(size))
+            file.write(json_dumps_lines(data))
+    except Exception as e:
+        print(f"Error saving data: {e}")
+    return True
+
+def parse_timestamp(timestamp):
+    # Timestamps are always "[YYYY-MM-DD]", so slice instead of strptime
+    return date(int(timestamp[1:5]), int(timestamp[6:8]), int(timestamp[9:11]))
 
 def clean_old_meals(meals, days=30):
-    cutoff = datetime.now() - timedelta(days=days)
+    cutoff = (datetime.now() - timedelta(days=days)).date()
     return [
         meal for meal in meals
-        if datetime.strptime(meal["timestamp"], "[%Y-%m-%d]") >= cutoff
+        if parse_timestamp(meal["timestamp"]) >= cutoff
     ]
 
-def add_meal(meal, meal_file, suggestion_file, date):
-    meals = load_file(meal_file)
-    if meals is None:
-        meals = []
-
-    meals = clean_old_meals(meals)
+class MealStore:
+    def __init__(self, meal_file, suggestion_file):
+        self.meal_file = meal_file
+        self.suggestion_file = suggestion_file
+        self.meals = []
+        self.new_meals = []
+        self.suggestions = {}
+        self.meals_corrupt = False
+        self.meals_cleaned = False
+        self.meals_dirty = False
+        self.suggestions_dirty = False
+
+    def __enter__(self):
+        self.meals = load_file(self.meal_file, json_loads_lines)
+        if self.meals is None:
+            self.meals = []
+            self.meals_corrupt = True
+        elif not self.meals and not os.path.exists(self.meal_file):
+            # Meals used to be stored as a single JSON document
+            legacy_meals = load_file(os.path.splitext(self.meal_file)[0] + ".json")
+            if legacy_meals:
+                self.meals = legacy_meals
+                self.meals_dirty = True
+
+        # Old meals are dropped on read, the file is only rewritten if any were
+        cleaned = clean_old_meals(self.meals)
+        if len(cleaned) != len(self.meals):
+            self.meals = cleaned
+            self.meals_cleaned = True
+
+        suggestions = load_file(self.suggestion_file)
+        if suggestions is None:
+            suggestions = {}
+        elif isinstance(suggestions, list):
+            # Suggestions used to be a list, key them by lowercase name
+            migrated = {}
+            for suggestion in suggestions:
+                migrated.setdefault(suggestion["content"].lower(), suggestion)
+            suggestions = migrated
+            self.suggestions_dirty = bool(suggestions)
+        self.suggestions = suggestions
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return False
+        if self.meals_dirty:
+            save_file(self.meals, self.meal_file, json_dumps_lines)
+        elif self.new_meals:
+            # Rewrite instead of appending if old meals were dropped or the
+            # file ends in an unterminated line
+            if self.meals_cleaned or not append_lines(self.new_meals, self.meal_file):
+                save_file(self.meals, self.meal_file, json_dumps_lines)
+        elif self.meals_cleaned:
+            # Dropping expired meals is not an edit, keep the backup for restore
+            save_file(self.meals, self.meal_file, json_dumps_lines, backup=False)
+        if self.suggestions_dirty:
+            save_file(self.suggestions, self.suggestion_file)
+        return False
+
+def add_meal(meal, store, timestamp):
+    if store.meals_corrupt:
+        print("Meal not added, the meal file is corrupted. Try restore.")
+        return
 
- 
     entry = {
-        "timestamp": current_timestamp() if date == None else date,
+        "timestamp": current_timestamp() if timestamp == None else timestamp,
         "content": meal
     }
-    meals.append(entry)
-    save_file(meals, meal_file)
+    store.meals.append(entry)
+    store.new_meals.append(entry)
     print(f"Meal added: {entry['content']}")
 
-    suggestions = load_file(suggestion_file)
-    if suggestions is None:
-        suggestions = []
-
     # Avoid duplicate suggestions
-    if not any(s["content"].lower() == meal.lower() for s in suggestions):
-        suggestions.append({"content": meal})
-        save_file(suggestions, suggestion_file)
+    meal_lc = meal.lower()
+    if meal_lc not in store.suggestions:
+        store.suggestions[meal_lc] = {"content": meal}
+        store.suggestions_dirty = True
 
-def list_meals(data_file):
-    data = load_file(data_file)
+def list_meals(store):
+    data = store.meals
     if not data:
         print("No meals found")
     else:
-        for i, item in enumerate(data, 1):
-            timestamp = item.get('timestamp')
-            content = item.get('content')
-            print(f"{i}. {timestamp} - {content}")
+        rows = [(item.get('timestamp'), item.get('content')) for item in data]
+        out = "\n".join(f"{i}. {timestamp} - {content}" for i, (timestamp, content) in enumerate(rows, 1))
+        sys.stdout.write(out + "\n")
 
-def delete_meal(index, data_file):
-    data = load_file(data_file)
+def delete_meal(index, store):
+    data = store.meals
     if 0 < index <= len(data):
         removed = data.pop(index - 1)
-        save_file(data, data_file)
+        store.meals_dirty = True
         meal_name = removed.get('content') 
         print(f"Deleted meal {index}: {meal_name}")
     else:
         print("Invalid meal number")
 
-def delete_suggestion(index, suggestion_file):
-    data = load_file(suggestion_file)
+def delete_suggestion(index, store):
+    data = store.suggestions
     if 0 < index <= len(data):
-        removed = data.pop(index - 1)
-        save_file(data, suggestion_file)
+        removed = data.pop(next(itertools.islice(data, index - 1, None)))
+        store.suggestions_dirty = True
         meal_name = removed.get('content') 
         print(f"Deleted suggestion meal {index}: {meal_name}")
     else:
         print("Invalid meal number")
 
-def delete_all(data_file):
-    save_file([], data_file)
+def delete_all(store):
+    store.meals = []
+    store.meals_dirty = True
     print("Deleted all meals")
 
 def restore(data_file, suggestion_file):
-    data_backup_file = os.path.join(os.path.dirname(data_file), "backup", BACKUP_SUFFIX + os.path.basename(data_file))
-    suggestion_backup_file = os.path.join(os.path.dirname(suggestion_file), "backup", BACKUP_SUFFIX + os.path.basename(suggestion_file))
+    data_backup_file = get_backup_file(data_file)
+    suggestion_backup_file = get_backup_file(suggestion_file)
     try:
-        with open(data_backup_file, "r", encoding=ENCODING) as file:
-            data = json.load(file)
-        with open(data_file, "w", encoding=ENCODING) as file:
-            json.dump(data, file, indent=2)
-        with open(suggestion_backup_file, "r", encoding=ENCODING) as file:
-            data = json.load(file)
-        with open(suggestion_file, "w", encoding=ENCODING) as file:
-            json.dump(data, file, indent=2)        
+        appended_from = read_append_size(data_file)
+        if appended_from is not None:
+            # The last change was an append, cut it off again
+            os.truncate(data_file, appended_from)
+        else:
+            with open(data_backup_file, "rb") as file:
+                data = json_loads_lines(file.read())
+            with open(data_file, "wb") as file:
+                file.write(json_dumps_lines(data))
+        with open(suggestion_backup_file, "rb") as file:
+            data = json_loads(file.read())
+        with open(suggestion_file, "wb") as file:
+            file.write(json_dumps(data))
         print("Successfully restored.")
     except FileNotFoundError:
         print("No file to restore from")
-    except json.JSONDecodeError:
+    except ValueError:
         print("Corrupted file. Abort restoring")
     except Exception as e:
         print(f"Error restoring data: {e}")
 
-def suggest_meal(meal_file, suggestion_file):
-    recent_meals = load_file(meal_file)
-    suggestions = load_file(suggestion_file)
+def suggest_meal(store):
+    import random
+
+    recent_meals = store.meals
+    suggestions = store.suggestions
 
-    if suggestions is None or not suggestions:
+    if not suggestions:
         print("No suggestions available.")
         return
 
-    recent_cutoff = datetime.now() - timedelta(days=14)
+    recent_cutoff = (datetime.now() - timedelta(days=14)).date()
 
-    recent_names = set()
-    if recent_meals:
-        for meal in recent_meals:
-            ts = datetime.strptime(meal["timestamp"], "[%Y-%m-%d]")
-            if ts >= recent_cutoff:
-                recent_names.add(meal["content"].lower())
+    recent_names = {
+        meal["content"].lower() for meal in recent_meals
+        if parse_timestamp(meal["timestamp"]) >= recent_cutoff
+    }
 
-    eligible = [m["content"] for m in suggestions if m["content"].lower() not in recent_names]
+    # Set difference runs in C, skip it entirely when nothing was eaten recently
+    eligible = suggestions.keys() - recent_names if recent_names else suggestions.keys()
 
     if eligible:
-        print("Suggested meal:", random.choice(eligible))
+        print("Suggested meal:", suggestions[random.choice(tuple(eligible))]["content"])
     else:
         print("No meal found that hasn't been eaten in the last 2 weeks.")
 
-def add_suggestion(meal, suggestion_file):
-    suggestions = load_file(suggestion_file)
-    if suggestions is None:
-        suggestions = []
-
-    if any(s["content"].lower() == meal.lower() for s in suggestions):
+def add_suggestion(meal, store):
+    meal_lc = meal.lower()
+    if meal_lc in store.suggestions:
         print(f"Suggestion '{meal}' already exists.")
     else:
-        suggestions.append({"content": meal})
-        save_file(suggestions, suggestion_file)
+        store.suggestions[meal_lc] = {"content": meal}
+        store.suggestions_dirty = True
         print(f"Added suggestion: {meal}")
 
-def list_suggestions(suggestion_file):
-    suggestions = load_file(suggestion_file)
+def list_suggestions(store):
+    suggestions = store.suggestions
     if not suggestions:
         print("No suggestions found.")
     else:
-        for i, s in enumerate(suggestions, 1):
-            print(f"{i}. {s.get('content')}")
-
-def main():
-    parser = argparse.ArgumentParser(description="Meal Tracker CLI")
+        rows = [s.get('content') for s in suggestions.values()]
+        out = "\n".join(f"{i}. {content}" for i, content in enumerate(rows, 1))
+        sys.stdout.write(out + "\n")
+
+def add_meal_argument(parser):
+    parser.add_argument("meal", nargs="+", help="Meal name")
+
+def add_index_argument(parser):
+    parser.add_argument("index", type=int, help="Meal number to delete")
+
+# Subcommand name -> (help, function adding its arguments)
+COMMANDS = {
+    "add": ("Add a new meal", add_meal_argument),
+    "addsuggest": ("Add meal only to suggestions", add_meal_argument),
+    "list": ("List all meals", None),
+    "delete": ("Delete a meal by number", add_index_argument),
+    "deletesuggestion": ("Delete a meal by number from suggestion", add_index_argument),
+    "deleteall": ("Delete all meals", None),
+    "restore": ("Restore from backup", None),
+    "suggest": ("Suggest a meal not eaten in the last 2 weeks", None),
+    "listsuggest": ("List all suggested meals", None),
+}
+OPTIONS_WITH_VALUE = ("--file", "-f", "--date", "-d")
+
+def find_command(argv):
+    takes_value = False
+    for arg in argv:
+        if takes_value:
+            takes_value = False
+        elif arg in OPTIONS_WITH_VALUE or (len(arg) > 2 and "=" not in arg and any(o.startswith(arg) for o in OPTIONS_WITH_VALUE)):
+            takes_value = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+class PartialParserError(Exception):
+    pass
+
+class PartialArgumentParser(argparse.ArgumentParser):
+    # Only knows the dispatched subcommand, so anything that would print usage
+    # or help is handed back to main to rerun with every subcommand
+    def error(self, message):
+        raise PartialParserError(message)
+
+    def print_help(self, file=None):
+        raise PartialParserError()
+
+def build_parser(names, parser_class=argparse.ArgumentParser):
+    parser = parser_class(description="Meal Tracker CLI")
     parser.add_argument("--file", "-f", help="Path to meal file")
     parser.add_argument("--date", "-d", help="Date of consumtion")
     parser.add_argument("--test", "-t", action="store_false", help="Test system")
     subparsers = parser.add_subparsers(dest="command", required=True)
+    for name in names:
+        help_text, add_arguments = COMMANDS[name]
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if add_arguments:
+            add_arguments(command_parser)
+    return parser
 
-    add_parser = subparsers.add_parser("add", help="Add a new meal")
-    add_parser.add_argument("meal", nargs="+", help="Meal name")
-
-    add_suggest_parser = subparsers.add_parser("addsuggest", help="Add meal only to suggestions")
-    add_suggest_parser.add_argument("meal", nargs="+", help="Meal name")
-
-    subparsers.add_parser("list", help="List all meals")
-
-    delete_parser = subparsers.add_parser("delete", help="Delete a meal by number")
-    delete_parser.add_argument("index", type=int, help="Meal number to delete")
-
-    delete_suggestion_parser = subparsers.add_parser("deletesuggestion", help="Delete a meal by number from suggestion")
-    delete_suggestion_parser.add_argument("index", type=int, help="Meal number to delete")
-
-    subparsers.add_parser("deleteall", help="Delete all meals")
-    subparsers.add_parser("restore", help="Restore from backup")
-    subparsers.add_parser("suggest", help="Suggest a meal not eaten in the last 2 weeks")
-    subparsers.add_parser("listsuggest", help="List all suggested meals")
-
-
-    args = parser.parse_args()
+def main():
+    # Only build the dispatched subparser, all of them for help and errors
+    args = None
+    command = find_command(sys.argv[1:])
+    if command in COMMANDS:
+        try:
+            args = build_parser([command], PartialArgumentParser).parse_args()
+        except PartialParserError:
+            pass
+    if args is None:
+        args = build_parser(COMMANDS).parse_args()
     data_file = get_data_file(args.test ,args.file)
     suggestion_file = get_suggestion_file(args.test, args.file)
 
-    if args.command == "add":
-        meal = get_meal_input(args.meal)
-        date = valid_date(args.date)
-        if meal:
-            add_meal(meal, data_file, suggestion_file, date)
-        else:
-            print("No meal content provided.")
-    elif args.command == "list":
-        list_meals(data_file)
-    elif args.command == "delete":
-        delete_meal(args.index, data_file)
-    elif args.command == "deletesuggestion":
-        delete_suggestion(args.index, suggestion_file)        
-    elif args.command == "deleteall":
-        delete_all(data_file)
-    elif args.command == "restore":
+    # Restore rewrites both files itself, so it must not run inside a store
+    if args.command == "restore":
         restore(data_file, suggestion_file)
-    elif args.command == "suggest":
-        suggest_meal(data_file, suggestion_file)
-    elif args.command == "addsuggest":
-        meal = get_meal_input(args.meal)
-        if meal:
-            add_suggestion(meal, suggestion_file)
-        else:
-            print("No meal content provided.")
-    elif args.command == "listsuggest":
-        list_suggestions(suggestion_file)
+        return
+
+    with MealStore(data_file, suggestion_file) as s:
+        if args.command == "add":
+            meal = get_meal_input(args.meal)
+            timestamp = valid_date(args.date)
+            if meal:
+                add_meal(meal, s, timestamp)
+            else:
+                print("No meal content provided.")
+        elif args.command == "list":
+            list_meals(s)
+        elif args.command == "delete":
+            delete_meal(args.index, s)
+        elif args.command == "deletesuggestion":
+            delete_suggestion(args.index, s)        
+        elif args.command == "deleteall":
+            delete_all(s)
+        elif args.command == "suggest":
+            suggest_meal(s)
+        elif args.command == "addsuggest":
+            meal = get_meal_input(args.meal)
+            if meal:
+                add_suggestion(meal, s)
+            else:
+                print("No meal content provided.")
+        elif args.command == "listsuggest":
+            list_suggestions(s)
 
 
 if __name__ == "__main__":